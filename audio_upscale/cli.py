@@ -4,14 +4,20 @@ Command Line Interface for Audio Upscaler
 """
 
 import os
+import glob
 import time
 import json
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import click
+from tqdm import tqdm
 
 from audio_upscale.core.upscaler import AudioUpscaler, get_enhancer_params
 from audio_upscale.enhancers import get_available_enhancers, create_enhancer_chain
 from audio_upscale.utils.preset_manager import (
-    list_presets, load_preset, save_preset, delete_preset, get_preset_info
+    list_presets, load_preset, save_preset, delete_preset, get_preset_info, get_all_preset_info
 )
 
 
@@ -26,6 +32,48 @@ def list_enhancers():
     return enhancers
 
 
+# File extensions picked up when batch-upscaling a directory
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3', '.aiff', '.aif')
+
+
+def build_upscaler(preset, intensity, harmonics_boost, noise_reduction,
+                   dynamic_boost, clarity, enhancers):
+    """
+    Create an upscaler from a preset or from command line settings
+    
+    Raises:
+        ValueError: If the preset doesn't exist
+    """
+    if preset:
+        click.echo(f"Loading preset: {preset}")
+        return AudioUpscaler.from_preset(preset)
+    
+    # Create enhancer chain if specified
+    enhancer_chain = []
+    if enhancers:
+        enhancer_list = [e.strip() for e in enhancers.split(',')]
+        for e_name in enhancer_list:
+            click.echo(f"Adding enhancer: {e_name}")
+            enhancer_config = [{'name': e_name}]
+            enhancer_chain.extend(create_enhancer_chain(enhancer_config))
+    
+    return AudioUpscaler(
+        intensity=intensity, 
+        harmonics_boost=harmonics_boost,
+        noise_reduction=noise_reduction,
+        dynamic_boost=dynamic_boost,
+        clarity_enhance=clarity,
+        enhancer_chain=enhancer_chain
+    )
+
+
+def _upscale_file(upscaler, input_file, output_file, frame_size):
+    """Process one file in a batch worker, keeping its progress output quiet"""
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        return upscaler.process_file(input_file, output_file, frame_size=frame_size)
+
+
 # Create a group for all commands
 @click.group()
 @click.version_option(package_name='audio_upscale')
@@ -53,33 +101,13 @@ def upscale(input_file, output_file, intensity, harmonics_boost, noise_reduction
     
     start_time = time.time()
     
-    # Handle preset loading
-    if preset:
-        try:
-            click.echo(f"Loading preset: {preset}")
-            upscaler = AudioUpscaler.from_preset(preset)
-        except ValueError as e:
-            click.echo(f"Error: {e}", err=True)
-            return
-    else:
-        # Create enhancer chain if specified
-        enhancer_chain = []
-        if enhancers:
-            enhancer_list = [e.strip() for e in enhancers.split(',')]
-            for e_name in enhancer_list:
-                click.echo(f"Adding enhancer: {e_name}")
-                enhancer_config = [{'name': e_name}]
-                enhancer_chain.extend(create_enhancer_chain(enhancer_config))
-        
-        # Create upscaler
-        upscaler = AudioUpscaler(
-            intensity=intensity, 
-            harmonics_boost=harmonics_boost,
-            noise_reduction=noise_reduction,
-            dynamic_boost=dynamic_boost,
-            clarity_enhance=clarity,
-            enhancer_chain=enhancer_chain
-        )
+    # Create upscaler from the preset or the given settings
+    try:
+        upscaler = build_upscaler(preset, intensity, harmonics_boost, noise_reduction,
+                                  dynamic_boost, clarity, enhancers)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
     
     # Save preset if requested
     if save_preset:
@@ -120,6 +148,85 @@ def upscale(input_file, output_file, intensity, harmonics_boost, noise_reduction
             click.echo(f"Error generating visualizations: {e}", err=True)
 
 
+@cli.command()
+@click.argument('input_path')
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--intensity', type=float, default=1.5, help='Overall effect intensity')
+@click.option('--harmonics-boost', type=float, default=0.3, help='Harmonic enhancement level')
+@click.option('--noise-reduction', type=float, default=0.2, help='Noise reduction strength')
+@click.option('--dynamic-boost', type=float, default=1.2, help='Dynamic range enhancement')
+@click.option('--clarity/--no-clarity', default=True, help='Apply clarity enhancement')
+@click.option('--frame-size', type=int, default=2048, help='FFT frame size')
+@click.option('--preset', type=str, help='Use a saved preset')
+@click.option('--enhancers', type=str, help='Comma-separated list of enhancers to apply')
+@click.option('--workers', type=click.IntRange(min=1), help='Number of worker processes (default: half the CPUs)')
+def batch_upscale(input_path, output_dir, intensity, harmonics_boost, noise_reduction,
+                  dynamic_boost, clarity, frame_size, preset, enhancers, workers):
+    """Upscale every audio file in a directory or matching a glob pattern."""
+    
+    start_time = time.time()
+    
+    if os.path.isdir(input_path):
+        input_files = sorted(os.path.join(input_path, f) for f in os.listdir(input_path)
+                             if f.lower().endswith(AUDIO_EXTENSIONS))
+    else:
+        input_files = sorted(f for f in glob.glob(input_path) if os.path.isfile(f))
+    
+    if not input_files:
+        click.echo(f"No audio files found for '{input_path}'", err=True)
+        return
+    
+    # Never write over the inputs, or let two inputs share an output file
+    output_real = os.path.realpath(output_dir)
+    if any(os.path.dirname(os.path.realpath(f)) == output_real for f in input_files):
+        click.echo("Error: the output directory must differ from the input files' directories", err=True)
+        return
+    
+    output_files = {}
+    for input_file in input_files:
+        output_file = os.path.join(output_dir, os.path.basename(input_file))
+        key = os.path.normcase(output_file)
+        if key in output_files:
+            click.echo(f"Error: {output_files[key][0]} and {input_file} would both be written "
+                       f"to {output_file}", err=True)
+            return
+        output_files[key] = (input_file, output_file)
+    
+    try:
+        upscaler = build_upscaler(preset, intensity, harmonics_boost, noise_reduction,
+                                  dynamic_boost, clarity, enhancers)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Each worker's FFTs are already multithreaded, so leave some headroom.
+    # Spawned workers avoid forking a process that may hold FFT thread pools.
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // 2)
+    
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            executor.submit(_upscale_file, upscaler, input_file, output_file, frame_size): input_file
+            for input_file, output_file in output_files.values()
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Upscaling files"):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append((futures[future], e))
+    
+    for input_file, error in failed:
+        click.echo(f"Error processing {input_file}: {error}", err=True)
+    
+    elapsed_time = time.time() - start_time
+    click.echo(f"Processed {len(input_files) - len(failed)} of {len(input_files)} files "
+               f"in {elapsed_time:.2f} seconds")
+
+
 @cli.command()
 def list_available_enhancers():
     """List all available spectral enhancers."""
@@ -152,16 +259,33 @@ def enhancer_info(enhancer_type):
 
 
 @cli.command()
-def show_presets():
+@click.option('--details', is_flag=True, help='Show the settings of every preset')
+def show_presets(details):
     """List all available presets."""
-    presets = list_presets()
+    if details:
+        try:
+            infos = get_all_preset_info()
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return
+        presets = [info["name"] for info in infos]
+    else:
+        presets = list_presets()
+    
     if not presets:
         click.echo("No presets found.")
         return
         
     click.echo("Available presets:")
-    for preset in presets:
-        click.echo(f"  • {preset}")
+    if not details:
+        for preset in presets:
+            click.echo(f"  • {preset}")
+        return
+    
+    for info in infos:
+        parameters = ", ".join(f"{key}={value}" for key, value in info["parameters"].items())
+        enhancers = ", ".join(enhancer['name'] for enhancer in info["enhancers"]) or "none"
+        click.echo(f"  • {info['name']}: {parameters}; enhancers: {enhancers}")
 
 
 @cli.command()
@@ -202,9 +326,10 @@ def delete_preset(preset_name):
 @click.argument('output_file', type=click.Path())
 @click.option('--output-dir', type=click.Path(), help='Directory to save visualizations')
 @click.option('--sample-duration', type=float, default=10.0, help='Duration (seconds) to analyze')
-def visualize(input_file, output_file, output_dir, sample_duration):
+@click.option('--single-figure/--separate-figures', default=False, help='Draw all panels in one figure')
+def visualize(input_file, output_file, output_dir, sample_duration, single_figure):
     """Visualize the difference between original and enhanced audio files."""
-    from audio_upscale.visualization import visualize_comparison
+    from audio_upscale.visualization import visualize_comparison, visualize_comparison_single
     
     output_path = output_file
     if output_dir:
@@ -212,7 +337,10 @@ def visualize(input_file, output_file, output_dir, sample_duration):
         basename = os.path.basename(output_file)
         output_path = os.path.join(output_dir, basename)
     
-    visualize_comparison(input_file, output_file, output=output_path, sample_duration=sample_duration)
+    if single_figure:
+        visualize_comparison_single(input_file, output_file, output=output_path, sample_duration=sample_duration)
+    else:
+        visualize_comparison(input_file, output_file, output=output_path, sample_duration=sample_duration)
 
 
 if __name__ == '__main__':
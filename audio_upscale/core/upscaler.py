@@ -5,11 +5,14 @@ Core Audio Upscaler implementation
 
 import os
 import time
+import functools
+import tempfile
 import numpy as np
-import librosa
 import soundfile as sf
 from tqdm import tqdm
 from scipy import signal
+from scipy.fft import rfft, irfft
+from numpy.lib.stride_tricks import sliding_window_view
 
 from audio_upscale.enhancers import (
     get_available_enhancers,
@@ -19,6 +22,13 @@ from audio_upscale.enhancers import (
 from audio_upscale.utils.preset_manager import load_preset, save_preset
 
 
+# Number of frames transformed and enhanced together in one batch
+FRAME_BLOCK_SIZE = 512
+
+# Peak level each channel is normalized to
+TARGET_LEVEL = 0.95
+
+
 class AudioUpscaler:
     """FFT-based audio upscaler with various enhancement techniques"""
     
@@ -42,65 +52,135 @@ class AudioUpscaler:
         self.clarity_enhance = clarity_enhance
         self.enhancer_chain = enhancer_chain or []
         
-    def _process_frame(self, frame):
-        """Process a single frame of audio using FFT"""
-        # Apply FFT to convert to frequency domain
-        fft_data = np.fft.rfft(frame)
-        magnitudes = np.abs(fft_data)
-        phases = np.angle(fft_data)
+        # Only convert spectra to polar form when some enhancer needs phases
+        self._modifies_phase = any(e.modifies_phase for e in self.enhancer_chain)
         
-        # Create a copy for processing
-        enhanced_magnitudes = magnitudes.copy()
-        enhanced_phases = phases.copy()
+        # Work buffers reused across frame batches, grown on demand
+        self._scratch_buffers = {}
         
-        # Noise floor reduction
-        if self.noise_reduction > 0:
-            noise_floor = np.mean(enhanced_magnitudes[-len(enhanced_magnitudes)//5:])
-            mask = enhanced_magnitudes > (noise_floor * (1 + self.noise_reduction * 3))
-            enhanced_magnitudes = enhanced_magnitudes * mask
+    def _scratch(self, name, shape, dtype=np.float32):
+        """Return a reusable work buffer of the given shape, reallocating only when it grows"""
+        size = int(np.prod(shape))
+        buffer = self._scratch_buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = self._scratch_buffers[name] = np.empty(size, dtype=dtype)
+        return buffer[:size].reshape(shape)
+    
+    def _prepare(self, frame_size, hop_length):
+        """Precompute the window and static gain curves for a frame size"""
+        n_bins = frame_size // 2 + 1
         
-        # Harmonic enhancement
-        if self.harmonics_boost > 0:
-            # Focus on the first half of the spectrum (most important harmonics)
-            harmonic_region = len(enhanced_magnitudes) // 2
-            boost_curve = np.linspace(1.0, 0.1, harmonic_region)
-            boost_amount = 1.0 + (boost_curve * self.harmonics_boost)
-            enhanced_magnitudes[:harmonic_region] *= boost_amount
+        self._analysis_window, self._synthesis_window = _stft_windows(frame_size, hop_length)
+        self._noise_region = slice(-n_bins//5, None)
         
-        # Overall intensity scaling
-        enhanced_magnitudes = enhanced_magnitudes * self.intensity
+        # Harmonic boost curve (focused on the first half of the spectrum)
+        harmonic_boost_curve = np.ones(n_bins, dtype=np.float32)
+        if self.harmonics_boost > 0:
+            harmonic_region = n_bins // 2
+            harmonic_boost_curve[:harmonic_region] += np.linspace(1.0, 0.1, harmonic_region, dtype=np.float32) * self.harmonics_boost
         
-        # Dynamic range enhancement
-        if self.dynamic_boost != 1.0:
-            # Compress or expand the dynamic range
-            mean_magnitude = np.mean(enhanced_magnitudes)
-            enhanced_magnitudes = mean_magnitude + (enhanced_magnitudes - mean_magnitude) * self.dynamic_boost
-            enhanced_magnitudes = np.maximum(0, enhanced_magnitudes)  # Ensure no negative values
+        # Clarity boost of the mid-range frequencies
+        clarity_mult = np.ones(n_bins, dtype=np.float32)
+        if self.clarity_enhance:
+            clarity_mult[n_bins // 8:n_bins // 3] = 1.2
         
-        # Clarity enhancement
+        # Fold the static gains into one vector. Clarity is applied after the
+        # dynamic range stage, so it can only be folded in when that stage is off.
+        self._static_gain = harmonic_boost_curve * self.intensity
+        self._clarity_mult = None
         if self.clarity_enhance:
-            # Enhance mid-range frequencies for better clarity
-            mid_start = len(enhanced_magnitudes) // 8
-            mid_end = len(enhanced_magnitudes) // 3
-            enhanced_magnitudes[mid_start:mid_end] *= 1.2
+            if self.dynamic_boost == 1.0:
+                self._static_gain *= clarity_mult
+            else:
+                self._clarity_mult = clarity_mult
+        
+        # Dynamic range expansion scales the gained spectrum around its mean:
+        # mean + (x * g - mean) * d == x * (g * d) + mean * (1 - d)
+        self._dynamic_gain = self._static_gain * self.dynamic_boost
+    
+    def _process_frames(self, frames):
+        """Process a block of audio frames using FFT
+        
+        Args:
+            frames: Array of shape (n_frames, frame_size), optionally with a
+                leading channel axis
+            
+        Returns:
+            Enhanced frames with the same shape
+        """
+        frame_size = frames.shape[-1]
+        
+        # Window the frames and convert them all to the frequency domain at once
+        windowed = np.multiply(frames, self._analysis_window, out=self._scratch('frames', frames.shape))
+        fft_data = rfft(windowed, axis=-1, workers=-1, overwrite_x=True)
+        magnitudes = np.abs(fft_data, out=self._scratch('magnitudes', fft_data.shape))
+        n_bins = magnitudes.shape[-1]
         
-        # Apply spectral enhancer chain if available
-        if self.enhancer_chain:
-            enhanced_magnitudes, enhanced_phases = apply_enhancer_chain(
-                enhanced_magnitudes, enhanced_phases, self.enhancer_chain)
+        # The enhanced spectrum is built in a scratch buffer reused across batches
+        out = self._scratch('enhanced', magnitudes.shape)
         
-        # Reconstruct the signal
-        enhanced_fft = enhanced_magnitudes * np.exp(1j * enhanced_phases)
-        enhanced_frame = np.fft.irfft(enhanced_fft)
+        # Noise floor reduction (a per-bin mask, so it commutes with the gains)
+        masked_magnitudes = magnitudes
+        if self.noise_reduction > 0:
+            noise_floor = np.mean(magnitudes[..., self._noise_region], axis=-1, keepdims=True)
+            threshold = noise_floor * (1 + self.noise_reduction * 3)
+            masked_magnitudes = np.multiply(magnitudes, magnitudes > threshold, out=out)
         
-        return enhanced_frame
+        if self.dynamic_boost != 1.0:
+            # Compress or expand the dynamic range of each frame. The mean of
+            # the gained frame is a single dot product with the gain vector.
+            mean_magnitude = (masked_magnitudes @ self._static_gain)[..., np.newaxis] / n_bins
+            
+            # Harmonic boost, intensity and dynamic range in one multiply-add
+            enhanced_magnitudes = np.multiply(masked_magnitudes, self._dynamic_gain, out=out)
+            enhanced_magnitudes += mean_magnitude * (1 - self.dynamic_boost)
+            np.maximum(enhanced_magnitudes, 0, out=enhanced_magnitudes)  # Ensure no negative values
+            
+            if self._clarity_mult is not None:
+                enhanced_magnitudes *= self._clarity_mult
+        else:
+            # Harmonic boost, intensity and clarity in a single multiply
+            enhanced_magnitudes = np.multiply(masked_magnitudes, self._static_gain, out=out)
+        
+        # Apply spectral enhancer chain to the whole block if available
+        if self._modifies_phase:
+            # Phase-modifying enhancers need the spectrum in polar form
+            enhanced_magnitudes, phases = apply_enhancer_chain(
+                enhanced_magnitudes,
+                np.arctan2(fft_data.imag, fft_data.real, out=self._scratch('phases', magnitudes.shape)),
+                self.enhancer_chain, copy=False)
+            
+            # Rebuild the spectrum in place from its real and imaginary parts
+            np.cos(phases, out=fft_data.real)
+            np.sin(phases, out=fft_data.imag)
+            fft_data.real *= enhanced_magnitudes
+            fft_data.imag *= enhanced_magnitudes
+        else:
+            if self.enhancer_chain:
+                enhanced_magnitudes, _ = apply_enhancer_chain(
+                    enhanced_magnitudes, None, self.enhancer_chain, copy=False)
+            
+            # Scale each bin by its magnitude gain, leaving the phase untouched.
+            # The gain overwrites the magnitudes and is applied to the real and
+            # imaginary parts as plain real multiplies.
+            silent = np.equal(magnitudes, 0, out=self._scratch('silent', magnitudes.shape, dtype=bool))
+            gain = np.divide(enhanced_magnitudes, magnitudes, out=magnitudes, where=~silent)
+            fft_data.real *= gain
+            fft_data.imag *= gain
+            
+            # Silent bins have zero phase, so their enhanced magnitude is the bin value
+            np.copyto(fft_data.real, enhanced_magnitudes, where=silent)
+        
+        # Reconstruct the signal (the spectrum is a private buffer, so it may be overwritten)
+        return irfft(fft_data, n=frame_size, axis=-1, workers=-1, overwrite_x=True)
     
     def process_audio(self, audio_data, sr, frame_size=2048, hop_length=1024, progress_callback=None):
         """
         Process the entire audio file
         
         Args:
-            audio_data: Input audio as numpy array
+            audio_data: Input audio as numpy array of shape (n_samples,) or
+                (n_samples, n_channels)
             sr: Sample rate
             frame_size: FFT frame size
             hop_length: Hop length between frames
@@ -109,69 +189,127 @@ class AudioUpscaler:
         Returns:
             Enhanced audio data
         """
-        # Handle mono/stereo
-        is_stereo = len(audio_data.shape) > 1 and audio_data.shape[1] == 2
+        # Spectral processing runs in single precision throughout
+        audio_data = np.asarray(audio_data, dtype=np.float32)
         
-        if is_stereo:
-            # Process each channel separately
-            left_channel = audio_data[:, 0]
-            right_channel = audio_data[:, 1]
-            
-            print("Processing left channel...")
-            enhanced_left = self._process_channel(left_channel, sr, frame_size, hop_length, progress_callback)
-            
-            print("Processing right channel...")
-            enhanced_right = self._process_channel(right_channel, sr, frame_size, hop_length, progress_callback)
-            
-            # Combine channels
-            enhanced_audio = np.column_stack((enhanced_left, enhanced_right))
+        # Handle mono/multichannel
+        if audio_data.ndim > 1:
+            # Process all channels together as a (n_channels, n_samples) batch
+            print(f"Processing {audio_data.shape[1]} channels...")
+            enhanced_audio = self._process_channel(audio_data.T, sr, frame_size, hop_length, progress_callback).T
         else:
             enhanced_audio = self._process_channel(audio_data, sr, frame_size, hop_length, progress_callback)
         
         return enhanced_audio
     
     def _process_channel(self, channel_data, sr, frame_size=2048, hop_length=1024, progress_callback=None):
-        """Process a single audio channel"""
+        """Process a single audio channel, or a (n_channels, n_samples) batch of channels"""
+        assert channel_data.dtype == np.float32, "audio must be float32"
+        n_samples = channel_data.shape[-1]
+        
         # Pad audio to ensure complete processing
-        pad_length = frame_size
-        padded_audio = np.pad(channel_data, (pad_length, pad_length), mode='reflect')
+        padded_audio = _reflect_pad(channel_data, frame_size)
         
-        # Prepare output array
-        enhanced_audio = np.zeros_like(padded_audio)
+        # Enhance the padded signal as a single block
+        enhanced_audio = np.empty(channel_data.shape, dtype=np.float32)
+        position = 0
+        for segment in self._enhance_stream([padded_audio], n_samples, frame_size, hop_length, progress_callback):
+            enhanced_audio[..., position:position + segment.shape[-1]] = segment
+            position += segment.shape[-1]
         
-        # Process in frames with overlap
-        total_frames = 1 + (len(padded_audio) - frame_size) // hop_length
+        # Normalize audio level of each channel
+        max_val = np.max(np.abs(enhanced_audio), axis=-1, keepdims=True)
+        gain = np.divide(TARGET_LEVEL, max_val, out=np.ones_like(max_val), where=max_val > 0)
+        enhanced_audio *= gain
         
-        with tqdm(total=total_frames, desc="Upscaling audio") as pbar:
-            for i in range(0, len(padded_audio) - frame_size, hop_length):
-                frame = padded_audio[i:i+frame_size]
-                enhanced_frame = self._process_frame(frame)
-                
-                # Overlap-add to output
-                enhanced_audio[i:i+frame_size] += enhanced_frame * signal.windows.hann(frame_size)
-                pbar.update(1)
-                
-                if progress_callback:
-                    progress_callback(i / (len(padded_audio) - frame_size))
+        return enhanced_audio
+    
+    def _enhance_stream(self, padded_blocks, n_samples, frame_size, hop_length, progress_callback=None):
+        """
+        Enhance a reflect-padded signal that arrives in consecutive blocks
+        
+        Frames are taken every hop_length samples of the padded signal and
+        processed in batches of up to FRAME_BLOCK_SIZE as soon as enough input
+        has arrived; output is yielded as soon as no later frame overlaps it.
         
-        # Normalize for the overlap
-        num_overlaps = frame_size // hop_length
-        enhanced_audio /= num_overlaps
+        Args:
+            padded_blocks: Iterable of (..., n) float32 blocks of the signal,
+                reflect-padded by frame_size samples on both sides
+            n_samples: Length of the signal without padding
+            frame_size: FFT frame size
+            hop_length: Hop length between frames
+            progress_callback: Optional callback for progress updates
+            
+        Yields:
+            Consecutive (..., n) blocks of the enhanced, unpadded signal
+            (n_samples in total), before level normalization. The blocks are
+            views into a reused buffer and are only valid until the next one
+            is requested.
+        """
+        pad_length = frame_size
+        n_frames = len(range(0, n_samples + pad_length, hop_length))
+        n_chunks = -(-frame_size // hop_length)
+        carry_length = (n_chunks - 1) * hop_length
         
-        # Remove padding
-        enhanced_audio = enhanced_audio[pad_length:-pad_length]
+        self._prepare(frame_size, hop_length)
+        for enhancer in self.enhancer_chain:
+            enhancer.reset()
         
-        # Normalize audio level
-        max_val = np.max(np.abs(enhanced_audio))
-        if max_val > 0:
-            target_level = 0.95
-            current_level = max_val
-            gain = target_level / current_level
-            enhanced_audio = enhanced_audio * gain
+        pending = None   # Input not yet consumed, starting at the next frame
+        output = None    # Overlap-add buffer, starting with the output of earlier frames past that point
+        position = 0     # Padded position of the next frame
+        next_frame = 0
+        skip = 0         # Input still to drop before the next frame when the hop exceeds the frame
         
-        return enhanced_audio
+        with tqdm(total=n_frames, desc="Upscaling audio") as pbar:
+            for block in padded_blocks:
+                if skip > 0:
+                    dropped = min(skip, block.shape[-1])
+                    block = block[..., dropped:]
+                    skip -= dropped
+                
+                if pending is None or pending.shape[-1] == 0:
+                    pending = block
+                else:
+                    pending = np.concatenate((pending, block), axis=-1)
+                
+                # Process every frame that is fully available
+                available = max(0, (pending.shape[-1] - frame_size) // hop_length + 1)
+                while next_frame < n_frames and available > 0:
+                    count = min(FRAME_BLOCK_SIZE, n_frames - next_frame, available)
+                    
+                    # Frame the input as a zero-copy strided view
+                    frames = sliding_window_view(pending, frame_size, axis=-1)[..., :count * hop_length:hop_length, :]
+                    enhanced_frames = self._process_frames(frames)
+                    enhanced_frames *= self._synthesis_window
+                    
+                    # Overlap-add on top of what earlier frames left past this point
+                    if output is None:
+                        output = np.zeros(pending.shape[:-1] + (FRAME_BLOCK_SIZE * hop_length + carry_length,),
+                                          dtype=np.float32)
+                    _overlap_add(output, enhanced_frames, hop_length)
+                    
+                    # Everything before the next frame start is complete; drop the padding
+                    done = count * hop_length
+                    start = max(0, pad_length - position)
+                    stop = min(done, pad_length + n_samples - position)
+                    if stop > start:
+                        yield output[..., start:stop]
+                    
+                    # Move the overlapping tail to the front and clear the rest for the next batch
+                    output[..., :carry_length] = output[..., done:done + carry_length]
+                    output[..., carry_length:] = 0
+                    skip = max(0, done - pending.shape[-1])
+                    pending = pending[..., done:]
+                    position += done
+                    next_frame += count
+                    available -= count
+                    pbar.update(count)
+                    
+                    if progress_callback:
+                        progress_callback(next_frame / n_frames)
     
-    def process_file(self, input_file, output_file, frame_size=2048):
+    def process_file(self, input_file, output_file, frame_size=2048, block_duration=30.0):
         """
         Process an audio file and save the result
         
@@ -179,28 +317,60 @@ class AudioUpscaler:
             input_file: Path to input audio file
             output_file: Path to save enhanced audio
             frame_size: FFT frame size
+            block_duration: Files longer than this (in seconds) are streamed
+                in blocks of this length instead of being loaded whole.
+                None always loads the whole file.
             
         Returns:
             dict: Processing statistics
         """
         start_time = time.time()
         
-        # Load audio file
-        print(f"Loading audio file: {input_file}")
+        # Stream long files that soundfile can read; load everything else whole
         try:
-            audio_data, sr = librosa.load(input_file, sr=None, mono=False)
-        except Exception as e:
-            raise RuntimeError(f"Error loading audio file: {e}")
+            info = sf.info(input_file)
+        except RuntimeError:
+            info = None
         
-        duration = librosa.get_duration(y=audio_data, sr=sr)
-        print(f"Loaded audio: {sr}Hz, {duration:.2f} seconds")
+        # Blocks must be longer than the frame_size reflect padding, so only
+        # files longer than one such block are streamed
+        blocksize = None
+        if info is not None and block_duration:
+            blocksize = max(int(block_duration * info.samplerate), frame_size + 1)
         
-        # Process audio
-        enhanced_audio = self.process_audio(audio_data, sr, frame_size=frame_size)
-        
-        # Save enhanced audio
-        print(f"Saving enhanced audio to: {output_file}")
-        sf.write(output_file, enhanced_audio, sr)
+        if blocksize is not None and info.frames > max(blocksize, frame_size):
+            sr = info.samplerate
+            duration = info.frames / sr
+            print(f"Streaming audio file: {input_file}")
+            print(f"Audio: {sr}Hz, {duration:.2f} seconds")
+            
+            self._process_file_streaming(input_file, output_file, frame_size, blocksize)
+        else:
+            # Load audio file
+            print(f"Loading audio file: {input_file}")
+            try:
+                if info is not None:
+                    audio_data, sr = sf.read(input_file, dtype='float32', always_2d=False)
+                else:
+                    # Fall back to librosa (audioread) for formats libsndfile can't decode
+                    import librosa
+                    audio_data, sr = librosa.load(input_file, sr=None, mono=False)
+                    
+                    # librosa returns channels first; process_audio and soundfile expect channels last
+                    if audio_data.ndim > 1:
+                        audio_data = audio_data.T
+            except Exception as e:
+                raise RuntimeError(f"Error loading audio file: {e}")
+            
+            duration = len(audio_data) / sr
+            print(f"Loaded audio: {sr}Hz, {duration:.2f} seconds")
+            
+            # Process audio
+            enhanced_audio = self.process_audio(audio_data, sr, frame_size=frame_size)
+            
+            # Save enhanced audio
+            print(f"Saving enhanced audio to: {output_file}")
+            sf.write(output_file, enhanced_audio, sr)
         
         elapsed_time = time.time() - start_time
         print(f"Processing completed in {elapsed_time:.2f} seconds")
@@ -215,6 +385,35 @@ class AudioUpscaler:
             "frame_size": frame_size
         }
     
+    def _process_file_streaming(self, input_file, output_file, frame_size, blocksize, hop_length=1024):
+        """
+        Process a file block by block, keeping memory use to about one block
+        
+        The enhanced signal is first written to a float temporary file while
+        tracking each channel's peak, then rescaled into the output file.
+        """
+        with sf.SoundFile(input_file) as infile, tempfile.TemporaryDirectory() as temp_dir:
+            sr = infile.samplerate
+            channels = infile.channels
+            temp_path = os.path.join(temp_dir, "enhanced.wav")
+            
+            # First pass: enhance into the temporary file
+            blocks = infile.blocks(blocksize=blocksize, dtype='float32', always_2d=True)
+            peak = np.zeros(channels, dtype=np.float32)
+            with sf.SoundFile(temp_path, 'w', sr, channels, subtype='FLOAT', format='RF64') as temp_file:
+                for segment in self._enhance_stream(_reflect_pad_blocks(blocks, frame_size),
+                                                    infile.frames, frame_size, hop_length):
+                    np.maximum(peak, np.max(np.abs(segment), axis=-1), out=peak)
+                    temp_file.write(segment.T)
+            
+            # Second pass: normalize audio level of each channel into the output
+            print(f"Saving enhanced audio to: {output_file}")
+            gain = np.divide(TARGET_LEVEL, peak, out=np.ones_like(peak), where=peak > 0)
+            with sf.SoundFile(output_file, 'w', sr, channels) as outfile:
+                for block in sf.blocks(temp_path, blocksize=blocksize, dtype='float32', always_2d=True):
+                    block *= gain
+                    outfile.write(block)
+    
     def save_preset(self, preset_name):
         """Save current settings as a preset"""
         preset_data = {
@@ -233,19 +432,97 @@ class AudioUpscaler:
         """Create upscaler from a preset"""
         preset_data = load_preset(preset_name)
         
-        # Create enhancer chain if specified
+        # Create enhancer chain if specified; everything else is a parameter
         enhancer_chain = None
-        if "enhancers" in preset_data:
-            enhancer_chain = create_enhancer_chain(preset_data["enhancers"])
-            
-        # Remove enhancers from the preset data
-        if "enhancers" in preset_data:
-            del preset_data["enhancers"]
+        enhancers = preset_data.pop("enhancers", None)
+        if enhancers is not None:
+            enhancer_chain = create_enhancer_chain(enhancers)
             
         # Create upscaler with preset settings
         return cls(enhancer_chain=enhancer_chain, **preset_data)
 
 
+@functools.lru_cache(maxsize=16)
+def _stft_windows(frame_size, hop_length):
+    """
+    Build the (read-only) analysis and synthesis windows for a frame layout
+    
+    Both are a square-root periodic Hann, so frames are windowed by a Hann
+    overall. The synthesis half is scaled so that overlapping frames sum to
+    one (a Hann overlap-adds to sum(w) / hop).
+    """
+    hann = signal.windows.hann(frame_size, sym=False)
+    root_hann = np.sqrt(hann)
+    analysis_window = root_hann.astype(np.float32)
+    synthesis_window = (root_hann / (hann.sum() / hop_length)).astype(np.float32)
+    analysis_window.flags.writeable = False
+    synthesis_window.flags.writeable = False
+    return analysis_window, synthesis_window
+
+
+def _reflect_pad(audio, pad_length):
+    """Reflect-pad a signal along its last axis with a single allocation"""
+    if audio.shape[-1] <= pad_length:
+        # Signals shorter than the padding need repeated reflection
+        pad_width = [(0, 0)] * (audio.ndim - 1) + [(pad_length, pad_length)]
+        return np.pad(audio, pad_width, mode='reflect')
+    
+    padded = np.empty(audio.shape[:-1] + (audio.shape[-1] + 2 * pad_length,), dtype=audio.dtype)
+    padded[..., pad_length:-pad_length] = audio
+    padded[..., :pad_length] = audio[..., pad_length:0:-1]
+    padded[..., -pad_length:] = audio[..., -2:-pad_length - 2:-1]
+    return padded
+
+
+def _reflect_pad_blocks(blocks, pad_length):
+    """
+    Reflect-pad a stream of blocks the same way _reflect_pad pads a signal
+    
+    Args:
+        blocks: Iterable of (n_samples, n_channels) blocks; the first block
+            must be longer than pad_length
+        pad_length: Number of samples to reflect on each side
+        
+    Yields:
+        (n_channels, n_samples) blocks of the padded signal
+    """
+    tail = None
+    for block in blocks:
+        block = block.T
+        if tail is None:
+            yield block[..., pad_length:0:-1]
+            tail = block[..., :0]
+        yield block
+        
+        # Keep just enough of the end of the signal to reflect it
+        tail = np.concatenate((tail, block[..., -(pad_length + 1):]), axis=-1)[..., -(pad_length + 1):]
+    
+    yield tail[..., -2::-1]
+
+
+def _overlap_add(output, frames, hop_length):
+    """
+    Overlap-add a block of frames into the output buffer
+    
+    Each frame is split into hop-sized chunks; the k-th chunk of every frame
+    lands on a contiguous, hop-strided region of the output, so the whole
+    block is added with one vectorized operation per chunk.
+    
+    Args:
+        output: Output buffer of shape (..., n_samples), modified in place;
+            the first frame starts at its beginning
+        frames: Array of shape (..., n_frames, frame_size)
+        hop_length: Hop length between frames
+    """
+    n_frames, frame_size = frames.shape[-2:]
+    for k in range(0, frame_size, hop_length):
+        chunk = frames[..., k:k + hop_length]
+        # Splitting the last axis of a slice is always a view, so this writes through
+        target = output[..., k:k + n_frames * hop_length].reshape(
+            output.shape[:-1] + (n_frames, hop_length))
+        target[..., :chunk.shape[-1]] += chunk
+
+
 def get_enhancer_params(enhancer_type):
     """Return the available parameters for a given enhancer type"""
     enhancers = get_available_enhancers()
@@ -265,7 +542,8 @@ def get_enhancer_params(enhancer_type):
         }
     elif enhancer_type == 'exciter':
         return {
-            'drive': 1.5
+            'drive': 1.5,
+            'quality': 'fast'
         }
     elif enhancer_type == 'transient':
         return {
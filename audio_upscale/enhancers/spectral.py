@@ -4,20 +4,31 @@ Spectral Enhancement Plugins for Audio Upscaler
 """
 
 import numpy as np
+from scipy import signal
 from abc import ABC, abstractmethod
 
 
 class SpectralEnhancer(ABC):
     """Base class for spectral enhancement algorithms"""
     
+    # Whether process() changes the phase spectrum. Enhancers that leave
+    # phases untouched may be handed phases=None and must return it as-is.
+    modifies_phase = False
+    
     @abstractmethod
     def process(self, magnitudes, phases):
         """
         Process the spectral components
         
+        Both spectra may be a single frame of shape (n_bins,) or a block of
+        consecutive frames of shape (n_frames, n_bins), optionally with a
+        leading channel axis. Enhancers work in place: callers pass writable
+        buffers they own, and the (possibly modified) buffers are returned.
+        
         Args:
             magnitudes: FFT magnitude spectrum
-            phases: FFT phase spectrum
+            phases: FFT phase spectrum (None when no enhancer in the chain
+                modifies phases)
             
         Returns:
             enhanced_magnitudes: Enhanced magnitude spectrum
@@ -25,6 +36,10 @@ class SpectralEnhancer(ABC):
         """
         pass
     
+    def reset(self):
+        """Clear any state carried between frames before a new signal"""
+        pass
+    
     @property
     def name(self):
         """Return the name of the enhancer"""
@@ -46,41 +61,91 @@ class HarmonicEnhancer(SpectralEnhancer):
         self.harmonic_boost = harmonic_boost
         self.harmonic_decay = harmonic_decay
         self.preserve_phases = preserve_phases
+        self._prev_fundamental = None
+        self._gain_cache = {}
+    
+    def reset(self):
+        """Forget the previous fundamental and the cached harmonic gains"""
+        self._prev_fundamental = None
+        self._gain_cache = {}
+    
+    def _stabilize_fundamentals(self, fundamental_idx):
+        """
+        Hold the fundamental across frames while new peaks stay within 2 bins
+        
+        Args:
+            fundamental_idx: Peak bin per frame, frames along the last axis
+            
+        Returns:
+            Stabilized fundamentals with the same shape
+        """
+        frames = np.atleast_1d(fundamental_idx)
+        rows = frames.reshape(-1, frames.shape[-1]).tolist()
+        
+        # One held fundamental per channel, carried over from the previous call
+        if self._prev_fundamental is not None and self._prev_fundamental.shape == frames.shape[:-1]:
+            held = self._prev_fundamental.ravel().tolist()
+        else:
+            held = [0] * len(rows)
+        
+        for row, current in zip(rows, held):
+            for j, idx in enumerate(row):
+                if current > 0 and abs(idx - current) <= 2:
+                    row[j] = current
+                else:
+                    current = idx
+        
+        stabilized = np.array(rows).reshape(frames.shape)
+        self._prev_fundamental = stabilized[..., -1]
+        return stabilized.reshape(np.shape(fundamental_idx))
+    
+    def _harmonic_gain(self, fundamental_idx, n_bins):
+        """Build (or reuse) the per-bin gain that boosts the harmonics of a fundamental"""
+        key = (int(fundamental_idx), n_bins)
+        if key in self._gain_cache:
+            return self._gain_cache[key]
+        
+        # Place the boost of each harmonic up to the 7th, decreasing with higher
+        # harmonics, on a sparse comb
+        harmonics = np.arange(2, 8)
+        harmonic_idx = int(fundamental_idx) * harmonics
+        in_range = harmonic_idx < n_bins
+        comb = np.zeros(n_bins)
+        comb[harmonic_idx[in_range]] = self.harmonic_boost * (1 / (harmonics[in_range] ** self.harmonic_decay)) - 1
+        
+        # Spread each boost over a small region around its harmonic (stronger
+        # in the center, weaker at the edges) with a single convolution
+        window_size = max(3, min(5, n_bins // 1000))
+        kernel = np.hanning(2 * window_size + 1)
+        gain = (signal.fftconvolve(comb, kernel, mode='same') + 1).astype(np.float32)
+        
+        self._gain_cache[key] = gain
+        return gain
     
     def process(self, magnitudes, phases):
         """Enhance harmonics in the frequency spectrum"""
-        enhanced_magnitudes = magnitudes.copy()
-        enhanced_phases = phases
+        n_bins = magnitudes.shape[-1]
         
         # Find the fundamental frequency (simplistic approach - looking for peak in lower freq)
         # For more accurate results, consider implementing a proper pitch detection algorithm
-        lower_region = min(len(magnitudes) // 5, 100)
+        lower_region = min(n_bins // 5, 100)
         if lower_region > 0:
-            fundamental_idx = np.argmax(magnitudes[:lower_region])
-            if fundamental_idx > 0:  # Found a potential fundamental frequency
-                # Enhance harmonics
-                for harmonic in range(2, 8):  # Process up to 7th harmonic
-                    harmonic_idx = fundamental_idx * harmonic
-                    if harmonic_idx < len(magnitudes):
-                        # Calculate boost that decreases with higher harmonics
-                        boost = self.harmonic_boost * (1 / (harmonic ** self.harmonic_decay))
-                        
-                        # Apply boost to a small region around the harmonic frequency
-                        window_size = max(3, min(5, len(magnitudes) // 1000))
-                        start_idx = max(0, harmonic_idx - window_size)
-                        end_idx = min(len(magnitudes), harmonic_idx + window_size + 1)
-                        
-                        # Apply graduated boost (stronger in center, weaker at edges)
-                        window = np.hanning(end_idx - start_idx)
-                        boost_factors = 1 + (window * (boost - 1))
-                        enhanced_magnitudes[start_idx:end_idx] *= boost_factors
-        
-        return enhanced_magnitudes, enhanced_phases
+            fundamental_idx = self._stabilize_fundamentals(
+                np.argmax(magnitudes[..., :lower_region], axis=-1))
+            
+            # Frames sharing a fundamental share the same harmonic gain
+            for idx in np.unique(fundamental_idx):
+                if idx > 0:  # Found a potential fundamental frequency
+                    magnitudes[fundamental_idx == idx] *= self._harmonic_gain(idx, n_bins)
+        
+        return magnitudes, phases
 
 
 class SpectralWidener(SpectralEnhancer):
     """Widen the stereo image using spectral techniques"""
     
+    modifies_phase = True
+    
     def __init__(self, width=1.5, focus_region=(300, 5000)):
         """
         Initialize stereo widener
@@ -98,53 +163,61 @@ class SpectralWidener(SpectralEnhancer):
         # The actual stereo widening happens when processing both channels
         # and applying different phase shifts to each
         
-        enhanced_magnitudes = magnitudes.copy()
-        
         # Generate phase shift (normally would be applied differently to L and R channels)
         # For mono signals, this just adds some extra harmonics/overtones
-        phase_shift = np.linspace(0, np.pi/4 * (self.width - 1), len(phases))
-        enhanced_phases = phases + phase_shift
+        phase_shift = np.linspace(0, np.pi/4 * (self.width - 1), phases.shape[-1], dtype=np.float32)
+        phases += phase_shift
         
-        return enhanced_magnitudes, enhanced_phases
+        return magnitudes, phases
 
 
 class ExciterEnhancer(SpectralEnhancer):
     """Add harmonic excitement/saturation to the audio"""
     
-    def __init__(self, drive=1.5, freq_range=(1000, 16000)):
+    def __init__(self, drive=1.5, freq_range=(1000, 16000), quality='fast'):
         """
         Initialize harmonic exciter
         
         Args:
             drive: Drive/intensity of the effect (1.0 = subtle)
             freq_range: Frequency range to target (Hz)
+            quality: 'fast' for a rational tanh approximation, 'accurate' for np.tanh
         """
+        if quality not in ('fast', 'accurate'):
+            raise ValueError(f"Unknown quality '{quality}', expected 'fast' or 'accurate'")
+        
         self.drive = drive
         self.freq_range = freq_range
+        self.quality = quality
     
     def process(self, magnitudes, phases):
         """Add harmonic excitement to the spectrum"""
-        enhanced_magnitudes = magnitudes.copy()
-        
         # Simple saturation effect - creates gentle harmonics
         # For real-world implementation, use true waveshaping algorithms
-        enhanced_magnitudes = np.tanh(enhanced_magnitudes * self.drive) / self.drive
+        magnitudes *= self.drive
+        if self.quality == 'fast':
+            # Pade approximation x(27 + x^2) / (27 + 9x^2) of tanh, which reaches
+            # exactly 1 at |x| = 3 and is clamped there (max error ~0.024)
+            np.clip(magnitudes, -3.0, 3.0, out=magnitudes)
+            squared = np.square(magnitudes)
+            magnitudes *= squared + 27.0
+            squared *= 9.0
+            squared += 27.0
+            magnitudes /= squared
+        else:
+            np.tanh(magnitudes, out=magnitudes)
+        magnitudes /= self.drive
         
         # Apply frequency targeting - focus on the specified range
         # This would require knowledge of the frequency resolution (sample_rate / n_fft)
         # For demonstration, we'll use a simple bandpass-like approach
         
-        # Create a simple bandpass-like mask
-        mask = np.ones_like(enhanced_magnitudes)
-        mid_point = len(mask) // 2
-        
         # Apply very gentle boost to the target range (simplified version)
-        boost_region = slice(len(mask) // 8, len(mask) // 2)
-        mask[boost_region] = 1.1
-        
-        enhanced_magnitudes *= mask
+        n_bins = magnitudes.shape[-1]
+        boost_region = slice(n_bins // 8, n_bins // 2)
+        magnitudes[..., boost_region] *= 1.1
         
-        return enhanced_magnitudes, phases
+        return magnitudes, phases
 
 
 class TransientEnhancer(SpectralEnhancer):
@@ -162,33 +235,40 @@ class TransientEnhancer(SpectralEnhancer):
         self.attack_boost = attack_boost
         self._prev_magnitudes = None
     
+    def reset(self):
+        """Forget the previous frame"""
+        self._prev_magnitudes = None
+    
     def process(self, magnitudes, phases):
         """Enhance audio transients using spectral flux"""
-        enhanced_magnitudes = magnitudes.copy()
+        # Work on a block of consecutive frames; a single frame is a block of one
+        frames = magnitudes if magnitudes.ndim > 1 else magnitudes[np.newaxis]
         
-        # We need previous frame for transient detection
-        if self._prev_magnitudes is None:
-            self._prev_magnitudes = magnitudes
-            return enhanced_magnitudes, phases
+        # We need previous frame for transient detection (one per channel)
+        prev_shape = frames.shape[:-2] + frames.shape[-1:]
+        if self._prev_magnitudes is None or self._prev_magnitudes.shape != prev_shape:
+            current, previous = frames[..., 1:, :], frames[..., :-1, :]
+        else:
+            current = frames
+            previous = np.concatenate(
+                (self._prev_magnitudes[..., np.newaxis, :], frames[..., :-1, :]), axis=-2)
         
         # Calculate spectral flux (increase in magnitudes compared to previous frame)
-        flux = magnitudes - self._prev_magnitudes
+        flux = current - previous
         
         # Only boost positive flux (increases in energy = potential transients)
-        positive_flux = np.maximum(0, flux)
+        np.maximum(flux, 0, out=flux)
         
         # Detect actual transients (simplistic threshold-based approach)
-        threshold = np.mean(positive_flux) * (1 + self.sensitivity * 5)
-        transient_mask = positive_flux > threshold
+        threshold = np.mean(flux, axis=-1, keepdims=True) * (1 + self.sensitivity * 5)
         
-        # Apply boost to transients
-        boost_amount = 1.0 + (transient_mask * (self.attack_boost - 1.0))
-        enhanced_magnitudes *= boost_amount
+        # Store last input frame for the next call before boosting in place
+        self._prev_magnitudes = frames[..., -1, :].copy()
         
-        # Store current magnitudes for next frame
-        self._prev_magnitudes = magnitudes
+        # Apply boost to transients
+        np.multiply(current, self.attack_boost, out=current, where=flux > threshold)
         
-        return enhanced_magnitudes, phases
+        return magnitudes, phases
 
 
 def get_available_enhancers():
@@ -229,7 +309,7 @@ def create_enhancer_chain(config):
     return enhancers
 
 
-def apply_enhancer_chain(magnitudes, phases, enhancers):
+def apply_enhancer_chain(magnitudes, phases, enhancers, copy=True):
     """
     Apply a chain of enhancers to the spectral data
     
@@ -237,6 +317,8 @@ def apply_enhancer_chain(magnitudes, phases, enhancers):
         magnitudes: FFT magnitude spectrum
         phases: FFT phase spectrum
         enhancers: List of enhancer instances
+        copy: Whether to copy the inputs first. Pass False to let the
+            enhancers work directly on buffers the caller owns.
     
     Returns:
         enhanced_magnitudes: Processed magnitude spectrum
@@ -245,6 +327,12 @@ def apply_enhancer_chain(magnitudes, phases, enhancers):
     enhanced_magnitudes = magnitudes
     enhanced_phases = phases
     
+    # Enhancers modify their inputs in place, so one copy covers the chain
+    if copy:
+        enhanced_magnitudes = magnitudes.copy()
+        if phases is not None:
+            enhanced_phases = phases.copy()
+    
     for enhancer in enhancers:
         enhanced_magnitudes, enhanced_phases = enhancer.process(
             enhanced_magnitudes, enhanced_phases)
@@ -4,12 +4,14 @@ from audio_upscale.utils.preset_manager import (
     list_presets,
     load_preset,
     save_preset,
-    delete_preset
+    delete_preset,
+    get_all_preset_info
 )
 
 __all__ = [
     'list_presets',
     'load_preset',
     'save_preset',
-    'delete_preset'
+    'delete_preset',
+    'get_all_preset_info'
 ] 
\ No newline at end of file
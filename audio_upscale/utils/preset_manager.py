@@ -4,11 +4,18 @@ Preset management utilities for audio upscaler
 """
 
 import os
+import copy
 import json
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 
 PRESETS_DIR = os.path.expanduser("~/.audio_upscale/presets")
 
+# Preset names of the last directory listed, keyed by its path and mtime
+_listing_cache = {}
+
 
 def ensure_presets_dir():
     """Ensure the presets directory exists"""
@@ -21,9 +28,16 @@ def list_presets():
     presets_dir = ensure_presets_dir()
     if not os.path.exists(presets_dir):
         return []
-        
-    return [f.replace(".json", "") for f in os.listdir(presets_dir) 
-            if f.endswith(".json")]
+    
+    # Adding or removing a preset changes the directory's mtime
+    key = (presets_dir, os.stat(presets_dir).st_mtime_ns)
+    if key not in _listing_cache:
+        with os.scandir(presets_dir) as entries:
+            names = [entry.name[:-5] for entry in entries if entry.name.endswith(".json")]
+        _listing_cache.clear()
+        _listing_cache[key] = names
+    
+    return list(_listing_cache[key])
 
 
 def get_preset_path(preset_name):
@@ -31,6 +45,14 @@ def get_preset_path(preset_name):
     return os.path.join(PRESETS_DIR, f"{preset_name}.json")
 
 
+@functools.lru_cache(maxsize=64)
+def _read_preset(preset_path, mtime_ns):
+    """Parse a preset file; the modification time in the key invalidates stale entries"""
+    # json.loads decodes the raw bytes itself, skipping the text-mode reader
+    with open(preset_path, 'rb') as f:
+        return json.loads(f.read())
+
+
 def load_preset(preset_name):
     """
     Load a preset from file
@@ -46,11 +68,13 @@ def load_preset(preset_name):
     """
     preset_path = get_preset_path(preset_name)
     
-    if not os.path.exists(preset_path):
+    try:
+        mtime_ns = os.stat(preset_path).st_mtime_ns
+    except FileNotFoundError:
         raise ValueError(f"Preset '{preset_name}' not found")
     
-    with open(preset_path, 'r') as f:
-        return json.load(f)
+    # Callers may modify the result, so never hand out the cached dict itself
+    return copy.deepcopy(_read_preset(preset_path, mtime_ns))
 
 
 def save_preset(preset_name, preset_data):
@@ -67,9 +91,24 @@ def save_preset(preset_name, preset_data):
     presets_dir = ensure_presets_dir()
     preset_path = get_preset_path(preset_name)
     
-    with open(preset_path, 'w') as f:
-        json.dump(preset_data, f, indent=2)
+    # Serialize up front so the file is written in one call, into a uniquely
+    # named sibling file that then atomically replaces the preset; a failed
+    # write never leaves a truncated preset behind, and concurrent saves
+    # never share a temporary file
+    data = json.dumps(preset_data, indent=2)
+    fd, tmp_path = tempfile.mkstemp(dir=presets_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, preset_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
+    # A change within the timestamp resolution keeps the old mtime
+    _read_preset.cache_clear()
+    _listing_cache.clear()
     return preset_path
 
 
@@ -89,6 +128,8 @@ def delete_preset(preset_name):
         return False
     
     os.remove(preset_path)
+    _read_preset.cache_clear()
+    _listing_cache.clear()
     return True
 
 
@@ -107,19 +148,27 @@ def get_preset_info(preset_name):
     """
     preset_data = load_preset(preset_name)
     
-    # Format the preset data for display
-    info = {
+    # Format the preset data for display; the enhancers are popped before the
+    # remaining data is taken as the parameters
+    return {
         "name": preset_name,
-        "parameters": {},
-        "enhancers": []
+        "enhancers": preset_data.pop("enhancers", []),
+        "parameters": preset_data
     }
+
+
+def get_all_preset_info():
+    """
+    Get information about every available preset
     
-    # Extract enhancers
-    if "enhancers" in preset_data:
-        info["enhancers"] = preset_data["enhancers"]
-        del preset_data["enhancers"]
+    Presets are read in a thread pool, since file reads release the GIL.
     
-    # Everything else is parameters
-    info["parameters"] = preset_data
+    Returns:
+        list: Preset information dicts, in the order of list_presets()
+    """
+    preset_names = list_presets()
+    if not preset_names:
+        return []
     
-    return info 
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=min(32, len(preset_names))) as executor:
+        return list(executor.map(get_preset_info, preset_names))
@@ -1,15 +1,18 @@
 """Visualization utilities for audio processing."""
 
-from audio_upscale.visualization.visualize import (
-    plot_waveform_comparison,
-    plot_spectrum_comparison,
-    plot_spectral_difference,
-    visualize_comparison
-)
-
 __all__ = [
     'plot_waveform_comparison',
     'plot_spectrum_comparison',
     'plot_spectral_difference',
-    'visualize_comparison'
-] 
\ No newline at end of file
+    'compute_spectrograms',
+    'visualize_comparison',
+    'visualize_comparison_single'
+]
+
+
+def __getattr__(name):
+    """Import the plotting module only when one of its functions is used"""
+    if name in __all__:
+        from audio_upscale.visualization import visualize
+        return getattr(visualize, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
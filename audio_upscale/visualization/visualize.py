@@ -5,109 +5,325 @@ Visualization module for the audio upscaler
 
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import librosa
-import librosa.display
+import soundfile as sf
 import click
+from scipy.fft import rfft
+from numpy.lib.stride_tricks import sliding_window_view
 
+# matplotlib and librosa are slow to import, so they are imported where
+# they are used; the upscaler itself never needs them
 
-def plot_waveform_comparison(original, enhanced, sr, title="Waveform Comparison"):
-    """Plot original vs enhanced waveform"""
-    plt.figure(figsize=(12, 6))
+
+# Resolution of saved figures, plenty for an on-screen preview
+SAVE_DPI = 150
+
+# Fast PNG encoding: light zlib compression and no extra optimization pass
+PNG_SAVE_KWARGS = {'compress_level': 3, 'optimize': False}
+
+# Width of the plots in pixels (12 inches at SAVE_DPI); drawing more than
+# about two points or one spectrogram frame per pixel column adds nothing visible
+PLOT_WIDTH_PX = 12 * SAVE_DPI
+
+# Hop length of the comparison spectrograms
+SPECTROGRAM_HOP = 512
+
+
+def _subplots(nrows, figsize, offscreen):
+    """
+    Create a figure with nrows stacked axes
     
-    # Ensure we're comparing the same length
-    min_len = min(len(original), len(enhanced))
-    original = original[:min_len]
-    enhanced = enhanced[:min_len]
+    Offscreen figures are plain matplotlib Figures that are only saved: they
+    bypass pyplot, so neither its backend nor its open figures are touched.
     
-    time = np.linspace(0, min_len/sr, min_len)
+    Returns:
+        fig: The figure
+        axes: Its axes (a single Axes when nrows is 1)
+    """
+    if offscreen:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize)
+        return fig, fig.subplots(nrows, 1)
     
-    plt.subplot(2, 1, 1)
-    plt.plot(time, original)
-    plt.title("Original Waveform")
-    plt.xlabel("Time (s)")
-    plt.ylabel("Amplitude")
+    import matplotlib.pyplot as plt
+    return plt.subplots(nrows, 1, figsize=figsize)
+
+
+def _save_figure(fig, path):
+    """Save a figure as a quickly encoded PNG without extra metadata"""
+    fig.savefig(path, dpi=SAVE_DPI, bbox_inches='tight',
+                pil_kwargs=PNG_SAVE_KWARGS, metadata={'Software': None})
+
+
+def _waveform_envelope(audio, sr, max_points=2 * PLOT_WIDTH_PX):
+    """
+    Reduce a waveform to at most max_points for plotting
     
-    plt.subplot(2, 1, 2)
-    plt.plot(time, enhanced)
-    plt.title("Enhanced Waveform")
-    plt.xlabel("Time (s)")
-    plt.ylabel("Amplitude")
+    Long signals are split into equal buckets and each bucket is drawn as
+    its minimum and maximum, so peaks survive the decimation.
     
-    plt.tight_layout()
-    return plt.gcf()
+    Returns:
+        time: Sample times in seconds
+        values: Waveform values at those times
+    """
+    stride = max(1, len(audio) // (max_points // 2))
+    if stride == 1:
+        return np.arange(len(audio)) / sr, audio
+    
+    n_buckets = len(audio) // stride
+    buckets = audio[:n_buckets * stride].reshape(n_buckets, stride)
+    values = np.empty((n_buckets, 2), dtype=audio.dtype)
+    np.min(buckets, axis=1, out=values[:, 0])
+    np.max(buckets, axis=1, out=values[:, 1])
+    
+    time = np.repeat(np.arange(n_buckets) * (stride / sr), 2)
+    return time, values.ravel()
 
 
-def plot_spectrum_comparison(original, enhanced, sr, title="Spectrum Comparison"):
-    """Plot original vs enhanced frequency spectrum"""
-    plt.figure(figsize=(12, 6))
+def plot_waveform_comparison(original, enhanced, sr, title="Waveform Comparison", axes=None):
+    """
+    Plot original vs enhanced waveform
+    
+    Args:
+        original: Original audio signal
+        enhanced: Enhanced audio signal
+        sr: Sample rate
+        title: Figure title
+        axes: Optional pair of axes to draw into; a new figure is created otherwise
+        
+    Returns:
+        The figure drawn into
+    """
+    import matplotlib.pyplot as plt
+    
+    own_figure = axes is None
+    if own_figure:
+        _, axes = plt.subplots(2, 1, figsize=(12, 6))
     
     # Ensure we're comparing the same length
     min_len = min(len(original), len(enhanced))
     original = original[:min_len]
     enhanced = enhanced[:min_len]
     
-    # Compute FFT
-    n_fft = 2048
-    original_fft = np.abs(librosa.stft(original, n_fft=n_fft))
-    enhanced_fft = np.abs(librosa.stft(enhanced, n_fft=n_fft))
+    for ax, audio, label in zip(axes, (original, enhanced), ("Original", "Enhanced")):
+        ax.plot(*_waveform_envelope(audio, sr))
+        ax.set_title(f"{label} Waveform")
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Amplitude")
     
-    # Convert to dB scale
-    original_db = librosa.amplitude_to_db(original_fft, ref=np.max)
-    enhanced_db = librosa.amplitude_to_db(enhanced_fft, ref=np.max)
+    fig = axes[0].figure
+    if own_figure:
+        fig.tight_layout()
+    return fig
+
+
+def _block_stft(y, n_fft=2048, hop_length=SPECTROGRAM_HOP, block_size=64):
+    """
+    Compute a magnitude STFT a block of frames at a time
     
-    plt.subplot(2, 1, 1)
-    librosa.display.specshow(original_db, sr=sr, x_axis='time', y_axis='log')
-    plt.colorbar(format='%+2.0f dB')
-    plt.title("Original Spectrogram")
+    Matches np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length)):
+    centered frames over a zero-padded signal and a periodic Hann window.
+    Frames are strided views of the signal, and only block_size windowed
+    frames per signal are held in memory at once.
+    
+    Args:
+        y: Signal of shape (..., n_samples)
+        n_fft: FFT size
+        hop_length: Hop length between frames
+        block_size: Number of frames transformed together
+        
+    Returns:
+        Magnitude spectrogram of shape (..., 1 + n_fft // 2, n_frames)
+    """
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
     
-    plt.subplot(2, 1, 2)
-    librosa.display.specshow(enhanced_db, sr=sr, x_axis='time', y_axis='log')
-    plt.colorbar(format='%+2.0f dB')
-    plt.title("Enhanced Spectrogram")
+    pad = n_fft // 2
+    padded = np.pad(y.astype(np.float32, copy=False), [(0, 0)] * (y.ndim - 1) + [(pad, pad)])
+    frames = sliding_window_view(padded, n_fft, axis=-1)[..., ::hop_length, :]
+    n_frames = frames.shape[-2]
     
-    plt.tight_layout()
-    return plt.gcf()
+    magnitudes = np.empty(y.shape[:-1] + (n_frames, n_fft // 2 + 1), dtype=np.float32)
+    windowed = np.empty(y.shape[:-1] + (min(block_size, n_frames), n_fft), dtype=np.float32)
+    for start in range(0, n_frames, block_size):
+        block = frames[..., start:start + block_size, :]
+        count = block.shape[-2]
+        np.multiply(block, window, out=windowed[..., :count, :])
+        np.abs(rfft(windowed[..., :count, :], axis=-1, workers=-1),
+               out=magnitudes[..., start:start + count, :])
+    
+    return magnitudes.swapaxes(-1, -2)
 
 
-def plot_spectral_difference(original, enhanced, sr, title="Spectral Enhancement"):
-    """Plot the difference between original and enhanced spectrum"""
-    plt.figure(figsize=(12, 4))
+def _show_spectrogram(spectrogram_db, sr, ax):
+    """
+    Draw a dB spectrogram with at most one frame per pixel column
     
-    # Ensure we're comparing the same length
+    Longer spectrograms are averaged over groups of adjacent frames before
+    drawing, which keeps the mesh small. Frequency bins are left alone, as
+    the log axis spreads the low bins over many pixels.
+    
+    Returns:
+        The QuadMesh drawn
+    """
+    import librosa.display
+    
+    n_frames = spectrogram_db.shape[-1]
+    factor = -(-n_frames // PLOT_WIDTH_PX)
+    if factor > 1:
+        n_columns = n_frames // factor
+        spectrogram_db = spectrogram_db[:, :n_columns * factor].reshape(
+            spectrogram_db.shape[0], n_columns, factor).mean(axis=-1)
+    
+    return librosa.display.specshow(spectrogram_db, sr=sr, hop_length=SPECTROGRAM_HOP * factor,
+                                    x_axis='time', y_axis='log', ax=ax)
+
+
+def compute_spectrograms(original, enhanced, n_fft=2048):
+    """
+    Compute the magnitude spectrograms of original and enhanced audio
+    
+    Args:
+        original: Original audio signal
+        enhanced: Enhanced audio signal
+        n_fft: FFT size
+        
+    Returns:
+        original_fft: Magnitude spectrogram of the original
+        enhanced_fft: Magnitude spectrogram of the enhanced audio, over the
+            same length of signal
+    """
+    # Ensure we're comparing the same length, then transform both signals
+    # as one two-channel STFT
     min_len = min(len(original), len(enhanced))
-    original = original[:min_len]
-    enhanced = enhanced[:min_len]
+    both = np.stack((original[:min_len], enhanced[:min_len]))
+    spectrograms = _block_stft(both, n_fft=n_fft)
+    return spectrograms[0], spectrograms[1]
+
+
+def plot_spectrum_comparison(original_fft, enhanced_fft, sr, title="Spectrum Comparison", axes=None,
+                             refs=None):
+    """
+    Plot original vs enhanced magnitude spectrograms
+    
+    Args:
+        original_fft: Magnitude spectrogram of the original (see compute_spectrograms)
+        enhanced_fft: Magnitude spectrogram of the enhanced audio
+        sr: Sample rate
+        title: Figure title
+        axes: Optional pair of axes to draw into; a new figure is created otherwise
+        refs: Optional (original, enhanced) peak magnitudes used as 0 dB,
+            when the caller already has them
+        
+    Returns:
+        The figure drawn into
+    """
+    import matplotlib.pyplot as plt
+    import librosa
     
-    # Compute FFT
-    n_fft = 2048
-    original_fft = np.abs(librosa.stft(original, n_fft=n_fft))
-    enhanced_fft = np.abs(librosa.stft(enhanced, n_fft=n_fft))
+    own_figure = axes is None
+    if own_figure:
+        _, axes = plt.subplots(2, 1, figsize=(12, 6))
+    fig = axes[0].figure
     
-    # Compute difference
-    diff = enhanced_fft - original_fft
+    if refs is None:
+        refs = (float(original_fft.max()), float(enhanced_fft.max()))
     
-    # Convert to dB scale
-    diff_db = librosa.amplitude_to_db(np.abs(diff), ref=np.max(original_fft))
+    # Convert to dB scale relative to each spectrogram's peak
+    original_db = librosa.amplitude_to_db(original_fft, ref=refs[0])
+    enhanced_db = librosa.amplitude_to_db(enhanced_fft, ref=refs[1])
     
-    librosa.display.specshow(diff_db, sr=sr, x_axis='time', y_axis='log')
-    plt.colorbar(format='%+2.0f dB')
-    plt.title("Spectral Enhancement Difference")
+    for ax, spectrogram_db, label in zip(axes, (original_db, enhanced_db), ("Original", "Enhanced")):
+        mesh = _show_spectrogram(spectrogram_db, sr, ax)
+        fig.colorbar(mesh, ax=ax, format='%+2.0f dB')
+        ax.set_title(f"{label} Spectrogram")
     
-    plt.tight_layout()
-    return plt.gcf()
+    if own_figure:
+        fig.tight_layout()
+    return fig
 
 
-def visualize_comparison(original_file, enhanced_file, output=None, sample_duration=10.0):
-    """Visualize the difference between original and enhanced audio files."""
+def _difference_db(original_fft, enhanced_fft, ref):
+    """
+    Convert the magnitude difference of two spectrograms to dB in one buffer
+    
+    Equivalent to librosa.amplitude_to_db(np.abs(enhanced_fft - original_fft),
+    ref=ref) with its default amin (1e-5) and top_db (80), without the
+    intermediate arrays.
+    """
+    diff_db = np.subtract(enhanced_fft, original_fft)
+    np.abs(diff_db, out=diff_db)
+    np.maximum(diff_db, 1e-5, out=diff_db)
+    np.log10(diff_db, out=diff_db)
+    diff_db *= 20
+    diff_db -= 20 * np.log10(max(1e-5, ref))
+    np.maximum(diff_db, diff_db.max() - 80, out=diff_db)
+    return diff_db
+
+
+def plot_spectral_difference(original_fft, enhanced_fft, sr, title="Spectral Enhancement", ax=None,
+                             ref=None):
+    """
+    Plot the difference between original and enhanced magnitude spectrograms
+    
+    Args:
+        original_fft: Magnitude spectrogram of the original (see compute_spectrograms)
+        enhanced_fft: Magnitude spectrogram of the enhanced audio
+        sr: Sample rate
+        title: Figure title
+        ax: Optional axes to draw into; a new figure is created otherwise
+        ref: Optional peak magnitude of the original, used as 0 dB
+        
+    Returns:
+        The figure drawn into
+    """
+    import matplotlib.pyplot as plt
+    
+    own_figure = ax is None
+    if own_figure:
+        _, ax = plt.subplots(figsize=(12, 4))
+    fig = ax.figure
+    
+    if ref is None:
+        ref = float(original_fft.max())
+    
+    # Difference in dB relative to the original's peak
+    diff_db = _difference_db(original_fft, enhanced_fft, ref)
+    
+    mesh = _show_spectrogram(diff_db, sr, ax)
+    fig.colorbar(mesh, ax=ax, format='%+2.0f dB')
+    ax.set_title("Spectral Enhancement Difference")
     
+    if own_figure:
+        fig.tight_layout()
+    return fig
+
+
+def _load_mono(audio_file, duration):
+    """Load up to duration seconds of an audio file as a float32 mono signal"""
+    try:
+        info = sf.info(audio_file)
+    except RuntimeError:
+        # Formats soundfile can't read go through librosa
+        import librosa
+        return librosa.load(audio_file, sr=None, mono=True, duration=duration)
+    
+    # Decode only the frames that are needed, then downmix
+    frames = -1 if duration is None else int(duration * info.samplerate)
+    audio, sr = sf.read(audio_file, frames=frames, dtype='float32', always_2d=False)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return audio, sr
+
+
+def _load_comparison_audio(original_file, enhanced_file, sample_duration):
+    """Load the start of both files as mono signals at a common sample rate"""
     # Load audio files
     print("Loading audio files...")
-    y_orig, sr_orig = librosa.load(original_file, sr=None, duration=sample_duration)
-    y_enh, sr_enh = librosa.load(enhanced_file, sr=None, duration=sample_duration)
+    y_orig, sr_orig = _load_mono(original_file, sample_duration)
+    y_enh, sr_enh = _load_mono(enhanced_file, sample_duration)
     
     # Ensure same sample rate
     if sr_orig != sr_enh:
+        import librosa
         print(f"Warning: Sample rates differ ({sr_orig} vs {sr_enh}). Resampling...")
         if sr_orig > sr_enh:
             y_enh = librosa.resample(y_enh, orig_sr=sr_enh, target_sr=sr_orig)
@@ -118,21 +334,33 @@ def visualize_comparison(original_file, enhanced_file, output=None, sample_durat
     else:
         sr = sr_orig
     
-    # For stereo, use the first channel
-    if len(y_orig.shape) > 1:
-        y_orig = y_orig[0]
-    if len(y_enh.shape) > 1:
-        y_enh = y_enh[0]
+    return y_orig, y_enh, sr
+
+
+def visualize_comparison(original_file, enhanced_file, output=None, sample_duration=10.0):
+    """Visualize the difference between original and enhanced audio files."""
+    y_orig, y_enh, sr = _load_comparison_audio(original_file, enhanced_file, sample_duration)
+    offscreen = bool(output)
     
     # Create visualizations
     print("Generating waveform comparison...")
-    fig1 = plot_waveform_comparison(y_orig, y_enh, sr)
+    fig1, axes1 = _subplots(2, (12, 6), offscreen)
+    plot_waveform_comparison(y_orig, y_enh, sr, axes=axes1)
+    
+    # Both spectrogram figures share one pair of STFTs
+    original_fft, enhanced_fft = compute_spectrograms(y_orig, y_enh)
+    refs = (float(original_fft.max()), float(enhanced_fft.max()))
     
     print("Generating spectrum comparison...")
-    fig2 = plot_spectrum_comparison(y_orig, y_enh, sr)
+    fig2, axes2 = _subplots(2, (12, 6), offscreen)
+    plot_spectrum_comparison(original_fft, enhanced_fft, sr, axes=axes2, refs=refs)
     
     print("Generating spectral difference...")
-    fig3 = plot_spectral_difference(y_orig, y_enh, sr)
+    fig3, ax3 = _subplots(1, (12, 4), offscreen)
+    plot_spectral_difference(original_fft, enhanced_fft, sr, ax=ax3, ref=refs[0])
+    
+    for fig in (fig1, fig2, fig3):
+        fig.tight_layout()
     
     # Save or display
     if output:
@@ -143,8 +371,36 @@ def visualize_comparison(original_file, enhanced_file, output=None, sample_durat
         diff_out = f"{output_base}_difference.png"
         
         print(f"Saving visualizations to {output_base}_*.png")
-        fig1.savefig(waveform_out, dpi=300, bbox_inches='tight')
-        fig2.savefig(spectrum_out, dpi=300, bbox_inches='tight')
-        fig3.savefig(diff_out, dpi=300, bbox_inches='tight')
+        _save_figure(fig1, waveform_out)
+        _save_figure(fig2, spectrum_out)
+        _save_figure(fig3, diff_out)
+    else:
+        import matplotlib.pyplot as plt
+        plt.show()
+
+
+def visualize_comparison_single(original_file, enhanced_file, output=None, sample_duration=10.0):
+    """Visualize the difference between original and enhanced audio files in one figure."""
+    y_orig, y_enh, sr = _load_comparison_audio(original_file, enhanced_file, sample_duration)
+    
+    # Waveforms, spectrograms and their difference stacked in five panels
+    print("Generating comparison...")
+    fig, axes = _subplots(5, (12, 14), offscreen=bool(output))
+    plot_waveform_comparison(y_orig, y_enh, sr, axes=axes[0:2])
+    
+    original_fft, enhanced_fft = compute_spectrograms(y_orig, y_enh)
+    refs = (float(original_fft.max()), float(enhanced_fft.max()))
+    plot_spectrum_comparison(original_fft, enhanced_fft, sr, axes=axes[2:4], refs=refs)
+    plot_spectral_difference(original_fft, enhanced_fft, sr, ax=axes[4], ref=refs[0])
+    fig.tight_layout()
+    
+    # Save or display
+    if output:
+        output_base = output.rsplit('.', 1)[0] if '.' in output else output
+        comparison_out = f"{output_base}_comparison.png"
+        
+        print(f"Saving visualization to {comparison_out}")
+        _save_figure(fig, comparison_out)
     else:
-        plt.show() 
\ No newline at end of file
+        import matplotlib.pyplot as plt
+        plt.show()
@@ -15,6 +15,12 @@ setup(
         "click>=8.0.0",
         "matplotlib>=3.4.0",
     ],
+    extras_require={
+        "test": [
+            "pytest>=7",
+            "pytest-xdist",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "audio-upscale=audio_upscale.cli:cli",
@@ -9,10 +9,20 @@ import unittest
 import sys
 import os
 
+try:
+    import pytest
+    import xdist  # noqa: F401 (provides pytest's -n option)
+except ImportError:
+    pytest = None
+
 if __name__ == '__main__':
     # Add the parent directory to the path so we can import the tests
     sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
     
+    # Spread the test cases over all cores when pytest-xdist is installed
+    if pytest is not None:
+        sys.exit(pytest.main(['-n', 'auto', os.path.dirname(__file__)]))
+    
     # Discover and run all tests
     test_suite = unittest.defaultTestLoader.discover(
         start_dir=os.path.dirname(__file__),
@@ -9,41 +9,57 @@ import os
 import sys
 import unittest
 import tempfile
+from unittest import mock
 import numpy as np
 import soundfile as sf
 from pathlib import Path
+from click.testing import CliRunner
 
 # Add parent directory to path to import audio_upscale
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from audio_upscale.core.upscaler import AudioUpscaler
 from audio_upscale.enhancers import create_enhancer_chain, get_available_enhancers
+from audio_upscale.enhancers.spectral import ExciterEnhancer, HarmonicEnhancer
+from audio_upscale.utils import preset_manager
+from audio_upscale.cli import cli
+from audio_upscale.visualization import visualize
 
 
 class TestAudioUpscaler(unittest.TestCase):
     """Test cases for the AudioUpscaler class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test audio and default upscaler shared by all tests."""
         # Create a simple test audio file (sine wave)
-        self.sample_rate = 22050
-        self.duration = 1.0  # 1 second
-        self.test_audio = np.sin(2 * np.pi * 440 * np.linspace(0, self.duration, int(self.sample_rate * self.duration)))
+        cls.sample_rate = 22050
+        cls.duration = 1.0  # 1 second
+        n_samples = int(cls.sample_rate * cls.duration)
+        t = np.arange(n_samples, dtype=np.float32)
+        cls.test_audio = np.sin(np.float32(2 * np.pi * 440 / cls.sample_rate) * t)
         
         # Create a temporary directory for test files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.test_input_path = os.path.join(self.temp_dir.name, "test_input.wav")
-        self.test_output_path = os.path.join(self.temp_dir.name, "test_output.wav")
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.test_input_path = os.path.join(cls.temp_dir.name, "test_input.wav")
         
         # Save the test audio
-        sf.write(self.test_input_path, self.test_audio, self.sample_rate)
+        sf.write(cls.test_input_path, cls.test_audio, cls.sample_rate)
         
-        # Create a default upscaler
-        self.upscaler = AudioUpscaler()
+        # Create a default upscaler shared by the tests, warmed up once so
+        # FFT plans and work buffers are ready before the first test
+        cls.upscaler = AudioUpscaler()
+        cls.upscaler.process_audio(cls.test_audio, cls.sample_rate)
     
-    def tearDown(self):
-        """Tear down test fixtures."""
-        self.temp_dir.cleanup()
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down the shared test audio."""
+        cls.temp_dir.cleanup()
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        # Each test writes its own output file
+        self.test_output_path = os.path.join(self.temp_dir.name, f"{self._testMethodName}.wav")
     
     def test_upscaler_initialization(self):
         """Test that the upscaler initializes with default parameters."""
@@ -108,6 +124,48 @@ class TestAudioUpscaler(unittest.TestCase):
         
         # Check that the output file exists
         self.assertTrue(os.path.exists(self.test_output_path))
+    
+    def test_streaming_matches_in_memory(self):
+        """Test that streaming a file in blocks gives the same result as loading it whole."""
+        stereo_path = os.path.join(self.temp_dir.name, "test_stereo_input.wav")
+        sf.write(stereo_path, np.column_stack((self.test_audio, self.test_audio[::-1])), self.sample_rate)
+        three_channel_path = os.path.join(self.temp_dir.name, "test_three_channel_input.wav")
+        sf.write(three_channel_path, np.column_stack((self.test_audio, self.test_audio[::-1], 0.5 * self.test_audio)),
+                 self.sample_rate)
+        
+        # Short input, and frames shorter than, equal to and not dividing the 1024 sample hop
+        short_path = os.path.join(self.temp_dir.name, "test_short_input.wav")
+        sf.write(short_path, self.test_audio[:1500], self.sample_rate)
+        cases = [(path, frame_size, 0.25)
+                 for path in (self.test_input_path, stereo_path, three_channel_path)
+                 for frame_size in (512, 1000, 1024, 2048, 3000)]
+        cases.append((short_path, 2048, 0.01))
+        
+        streamed_path = os.path.join(self.temp_dir.name, "test_streamed.wav")
+        upscaler = AudioUpscaler(enhancer_chain=create_enhancer_chain([{'name': 'transient'}]))
+        
+        for input_path, frame_size, block_duration in cases:
+            with self.subTest(input=os.path.basename(input_path), frame_size=frame_size):
+                upscaler.process_file(input_path, self.test_output_path, frame_size=frame_size,
+                                      block_duration=None)
+                upscaler.process_file(input_path, streamed_path, frame_size=frame_size,
+                                      block_duration=block_duration)
+                
+                in_memory, _ = sf.read(self.test_output_path)
+                streamed, _ = sf.read(streamed_path)
+                np.testing.assert_allclose(streamed, in_memory, atol=1e-4)
+    
+    def test_stereo_matches_mono_channels(self):
+        """Test that batched stereo processing matches processing each channel alone."""
+        stereo = np.column_stack((self.test_audio, self.test_audio[::-1]))
+        upscaler = AudioUpscaler(enhancer_chain=create_enhancer_chain([{'name': 'transient'}]))
+        
+        enhanced = upscaler.process_audio(stereo, self.sample_rate)
+        
+        self.assertEqual(enhanced.shape, stereo.shape)
+        for channel in range(2):
+            mono = upscaler.process_audio(np.ascontiguousarray(stereo[:, channel]), self.sample_rate)
+            np.testing.assert_allclose(enhanced[:, channel], mono, atol=1e-6)
 
 
 class TestEnhancers(unittest.TestCase):
@@ -123,6 +181,252 @@ class TestEnhancers(unittest.TestCase):
         expected_enhancers = ['harmonic', 'widener', 'exciter', 'transient']
         for enhancer in expected_enhancers:
             self.assertIn(enhancer, enhancers)
+    
+    def test_block_matches_single_frames(self):
+        """Test that processing a block of frames matches frame-by-frame processing."""
+        rng = np.random.default_rng(0)
+        magnitudes = rng.random((16, 1025))
+        phases = rng.uniform(-np.pi, np.pi, (16, 1025))
+        
+        for name, enhancer_class in get_available_enhancers().items():
+            block_magnitudes, block_phases = enhancer_class().process(magnitudes.copy(), phases.copy())
+        
+            single = enhancer_class()
+            for i in range(len(magnitudes)):
+                frame_magnitudes, frame_phases = single.process(magnitudes[i].copy(), phases[i].copy())
+                np.testing.assert_allclose(block_magnitudes[i], frame_magnitudes, err_msg=name)
+                np.testing.assert_allclose(block_phases[i], frame_phases, err_msg=name)
+    
+    def test_exciter_fast_saturation(self):
+        """Test that the fast exciter saturation stays close to np.tanh."""
+        magnitudes = np.linspace(0, 10, 1025)
+        
+        fast, _ = ExciterEnhancer(quality='fast').process(magnitudes.copy(), None)
+        accurate, _ = ExciterEnhancer(quality='accurate').process(magnitudes.copy(), None)
+        
+        np.testing.assert_allclose(fast, accurate, atol=0.03)
+        
+        with self.assertRaises(ValueError):
+            ExciterEnhancer(quality='bogus')
+    
+    def test_harmonic_gain_matches_per_harmonic_windows(self):
+        """Test that the comb-convolved harmonic gain matches boosting each harmonic in turn."""
+        enhancer = HarmonicEnhancer()
+        n_bins = 1025
+        window_size = 3
+        
+        # Fundamentals far enough apart that the harmonic windows do not overlap
+        for fundamental_idx in (20, 50, 150):
+            with self.subTest(fundamental_idx=fundamental_idx):
+                expected = np.ones(n_bins, dtype=np.float32)
+                for harmonic in range(2, 8):
+                    harmonic_idx = fundamental_idx * harmonic
+                    if harmonic_idx < n_bins:
+                        boost = enhancer.harmonic_boost * (1 / (harmonic ** enhancer.harmonic_decay))
+                        window = np.hanning(2 * window_size + 1)
+                        expected[harmonic_idx - window_size:harmonic_idx + window_size + 1] *= 1 + window * (boost - 1)
+                
+                np.testing.assert_allclose(enhancer._harmonic_gain(fundamental_idx, n_bins), expected, atol=1e-6)
+    
+    def test_stabilize_fundamentals(self):
+        """Test that the fundamental is held for moves of up to 2 bins."""
+        enhancer = HarmonicEnhancer()
+        
+        # 12 is within 2 bins of 10 and is held; 13 is 3 bins away and is not
+        np.testing.assert_array_equal(enhancer._stabilize_fundamentals(np.array([10, 12, 13])), [10, 10, 13])
+        
+        # The held fundamental carries over to the next block
+        np.testing.assert_array_equal(enhancer._stabilize_fundamentals(np.array([11, 16])), [13, 16])
+
+
+class TestPresets(unittest.TestCase):
+    """Test cases for the preset manager."""
+    
+    def setUp(self):
+        """Point the preset manager at a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(preset_manager, 'PRESETS_DIR', self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def test_cached_load_returns_fresh_copies(self):
+        """Test that cached preset loads can be modified and see later saves."""
+        preset_manager.save_preset('test', {'intensity': 1.0, 'enhancers': [{'name': 'harmonic'}]})
+        
+        preset = preset_manager.load_preset('test')
+        preset.pop('enhancers')
+        self.assertIn('enhancers', preset_manager.load_preset('test'))
+        
+        upscaler = AudioUpscaler.from_preset('test')
+        self.assertEqual(len(upscaler.enhancer_chain), 1)
+        
+        preset_manager.save_preset('test', {'intensity': 2.0})
+        self.assertEqual(preset_manager.load_preset('test'), {'intensity': 2.0})
+        
+        preset_manager.delete_preset('test')
+        with self.assertRaises(ValueError):
+            preset_manager.load_preset('test')
+    
+    def test_list_presets_tracks_changes(self):
+        """Test that the cached preset listing follows saves and deletes."""
+        self.assertEqual(preset_manager.list_presets(), [])
+        
+        preset_manager.save_preset('first', {'intensity': 1.0})
+        preset_manager.save_preset('second', {'intensity': 2.0})
+        self.assertCountEqual(preset_manager.list_presets(), ['first', 'second'])
+        
+        preset_manager.delete_preset('first')
+        self.assertEqual(preset_manager.list_presets(), ['second'])
+    
+    def test_get_all_preset_info(self):
+        """Test that preset info splits enhancers from the other parameters."""
+        self.assertEqual(preset_manager.get_all_preset_info(), [])
+        
+        preset_manager.save_preset('plain', {'intensity': 2.0})
+        preset_manager.save_preset('harmonic', {'intensity': 1.0, 'enhancers': [{'name': 'harmonic'}]})
+        
+        self.assertCountEqual(preset_manager.get_all_preset_info(), [
+            {'name': 'plain', 'enhancers': [], 'parameters': {'intensity': 2.0}},
+            {'name': 'harmonic', 'enhancers': [{'name': 'harmonic'}], 'parameters': {'intensity': 1.0}},
+        ])
+    
+    def test_show_presets_details(self):
+        """Test the show-presets --details listing."""
+        runner = CliRunner()
+        
+        result = runner.invoke(cli, ['show-presets', '--details'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output, "No presets found.\n")
+        
+        preset_manager.save_preset('plain', {'intensity': 2.0, 'noise_reduction': 0.1})
+        preset_manager.save_preset('harmonic', {'intensity': 1.0, 'enhancers': [{'name': 'harmonic'}]})
+        
+        result = runner.invoke(cli, ['show-presets', '--details'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        lines = result.output.splitlines()
+        self.assertEqual(lines[0], "Available presets:")
+        self.assertCountEqual(lines[1:], [
+            "  • plain: intensity=2.0, noise_reduction=0.1; enhancers: none",
+            "  • harmonic: intensity=1.0; enhancers: harmonic",
+        ])
+
+
+class TestVisualization(unittest.TestCase):
+    """Test cases for the visualization helpers."""
+    
+    def setUp(self):
+        """Create a pair of noisy test signals."""
+        rng = np.random.default_rng(0)
+        self.original = rng.standard_normal(22050).astype(np.float32)
+        self.enhanced = (0.7 * self.original + 0.01 * rng.standard_normal(22050)).astype(np.float32)
+    
+    def test_block_stft_matches_librosa(self):
+        """Test that the blocked STFT matches librosa's magnitude STFT."""
+        import librosa
+        
+        both = np.stack((self.original, self.enhanced))
+        for y in (self.original, self.original[:3000], both):
+            expected = np.abs(librosa.stft(y, n_fft=2048, hop_length=512))
+            spectrogram = visualize._block_stft(y)
+            
+            self.assertEqual(spectrogram.shape, expected.shape)
+            np.testing.assert_allclose(spectrogram, expected, rtol=0, atol=1e-6 * expected.max())
+    
+    def test_difference_db_matches_librosa(self):
+        """Test that the in-place dB difference matches librosa.amplitude_to_db."""
+        import librosa
+        
+        original_fft, enhanced_fft = visualize.compute_spectrograms(self.original, self.enhanced)
+        ref = float(original_fft.max())
+        expected = librosa.amplitude_to_db(np.abs(enhanced_fft - original_fft), ref=ref)
+        
+        np.testing.assert_allclose(visualize._difference_db(original_fft, enhanced_fft, ref), expected,
+                                   rtol=0, atol=1e-5)
+    
+    def test_saving_leaves_pyplot_alone(self):
+        """Test that saving comparisons neither switches the pyplot backend nor opens figures."""
+        import matplotlib.pyplot as plt
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original_file = os.path.join(temp_dir, "original.wav")
+            enhanced_file = os.path.join(temp_dir, "enhanced.wav")
+            sf.write(original_file, self.original, 22050)
+            sf.write(enhanced_file, self.enhanced, 22050)
+            output = os.path.join(temp_dir, "plot.png")
+            
+            with mock.patch.object(plt, 'switch_backend') as switch_backend:
+                visualize.visualize_comparison(original_file, enhanced_file, output=output)
+                visualize.visualize_comparison_single(original_file, enhanced_file, output=output)
+            
+            switch_backend.assert_not_called()
+            self.assertEqual(plt.get_fignums(), [])
+            for suffix in ("waveform", "spectrum", "difference", "comparison"):
+                self.assertTrue(os.path.exists(os.path.join(temp_dir, f"plot_{suffix}.png")))
+
+class TestBatchUpscale(unittest.TestCase):
+    """Test cases for the batch-upscale command."""
+    
+    def setUp(self):
+        """Create two input directories holding files with the same name."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.input_dirs = [os.path.join(self.temp_dir.name, name) for name in ("a", "b")]
+        self.output_dir = os.path.join(self.temp_dir.name, "out")
+        
+        audio = np.sin(np.float32(0.05) * np.arange(4096, dtype=np.float32))
+        for input_dir in self.input_dirs:
+            os.makedirs(input_dir)
+            sf.write(os.path.join(input_dir, "tone.wav"), audio, 22050)
+        sf.write(os.path.join(self.input_dirs[0], "other.wav"), audio[::-1], 22050)
+        
+        self.runner = CliRunner()
+    
+    def batch_upscale(self, *args):
+        """Run batch-upscale with a single worker."""
+        return self.runner.invoke(cli, ['batch-upscale', *args, '--workers', '1'])
+    
+    def test_directory_input(self):
+        """Test that every audio file in a directory is upscaled."""
+        result = self.batch_upscale(self.input_dirs[0], self.output_dir)
+        
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["other.wav", "tone.wav"])
+        self.assertIn("Processed 2 of 2 files", result.output)
+    
+    def test_colliding_outputs_are_refused(self):
+        """Test that inputs sharing a file name across directories are refused."""
+        result = self.batch_upscale(os.path.join(self.temp_dir.name, "*", "tone.wav"), self.output_dir)
+        
+        self.assertIn("would both be written", result.output)
+        self.assertFalse(os.path.exists(self.output_dir))
+    
+    def test_input_directory_as_output_is_refused(self):
+        """Test that the inputs' own directory is refused as the output directory."""
+        result = self.batch_upscale(self.input_dirs[0], self.input_dirs[0])
+        
+        self.assertIn("output directory must differ", result.output)
+        self.assertEqual(sorted(os.listdir(self.input_dirs[0])), ["other.wav", "tone.wav"])
+    
+    def test_unreadable_file_is_reported(self):
+        """Test that a file that fails is reported while the rest are processed."""
+        with open(os.path.join(self.input_dirs[0], "broken.wav"), 'w') as f:
+            f.write("not audio")
+        
+        result = self.batch_upscale(self.input_dirs[0], self.output_dir)
+        
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("broken.wav", result.output)
+        self.assertIn("Processed 2 of 3 files", result.output)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["other.wav", "tone.wav"])
+    
+    def test_zero_workers_is_rejected(self):
+        """Test that --workers must be positive."""
+        result = self.runner.invoke(cli, ['batch-upscale', self.input_dirs[0], self.output_dir, '--workers', '0'])
+        
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIsInstance(result.exception, SystemExit)
+        self.assertFalse(os.path.exists(self.output_dir))
 
 
 if __name__ == '__main__':